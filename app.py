@@ -1,15 +1,34 @@
+import asyncio
+import atexit
+import hashlib
+import io
 import os
-import re
+import random
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Optional, Tuple
-import json
 import logging
 from urllib.parse import urlparse, parse_qs
 
+import ctranslate2
+import orjson
+import requests
 import yt_dlp
-from youtube_transcript_api import YouTubeTranscriptApi
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from faster_whisper import BatchedInferencePipeline, WhisperModel
+from youtube_transcript_api import (
+    RequestBlocked,
+    YouTubeRequestFailed,
+    YouTubeTranscriptApi,
+)
 from youtube_transcript_api.formatters import TextFormatter
 from tqdm import tqdm
+from tqdm.asyncio import tqdm as atqdm
 
 # Set up logging
 logging.basicConfig(
@@ -18,11 +37,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Strips characters that are invalid in filenames; str.translate with a
+# prebuilt table deletes them in one C-level pass.
+_INVALID_CHAR_TABLE = str.maketrans('', '', '<>:"/\\|?*')
+
+# Audio temp directories still alive when the process exits (crash,
+# Ctrl-C mid-download) get swept so they don't accumulate on disk.
+_TEMP_AUDIO_DIRS = set()
+
+@atexit.register
+def _sweep_temp_audio_dirs():
+    for path in _TEMP_AUDIO_DIRS:
+        shutil.rmtree(path, ignore_errors=True)
+
 class YouTubeTranscriptDownloader:
+    # YouTube starts throttling transcript requests well below any
+    # connection limit, so keep the number of in-flight fetches modest.
+    MAX_CONCURRENT_FETCHES = 5
+
+    # Attempts per transcript when YouTube throttles or blocks a request,
+    # with exponential backoff between tries.
+    MAX_FETCH_ATTEMPTS = 5
+
+    # How long a cached channel listing stays valid before we go back
+    # to YouTube for a fresh one.
+    CHANNEL_CACHE_TTL = 6 * 60 * 60  # seconds
+
+    # 30-second chunks packed into one encoder forward pass by the
+    # batched Whisper pipeline.
+    WHISPER_BATCH_SIZE = 16
+
+    # How many fallback audio downloads may run ahead of inference.
+    # Matches the download pool plus one, so finished mp3s don't pile
+    # up on disk while the slower Whisper loop drains them.
+    WHISPER_PREFETCH = 5
+
     def __init__(self, output_dir: str = "transcripts"):
         """Initialize the downloader with an output directory."""
         self.output_dir = output_dir
         self.formatter = TextFormatter()
+
+        # Share one pooled session across every transcript request so the
+        # TCP+TLS handshake is paid once per host instead of once per video.
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(
+            pool_connections=16,
+            pool_maxsize=16,
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504]
+            )
+        ))
+        self._yt_api = YouTubeTranscriptApi(http_client=self._session)
+
+        # Audio downloads run on this pool so the I/O-bound fetch of the
+        # next video overlaps with Whisper inference on the current one;
+        # transcript file writes go to their own pool so persisting one
+        # video never blocks the event loop from fetching the next.
+        self._dl_pool = ThreadPoolExecutor(max_workers=4)
+        self._io_pool = ThreadPoolExecutor(max_workers=8)
+        self._whisper_lock = threading.Lock()
+        self._whisper_model = None
+        self._whisper_pipeline = None
         
     def _extract_channel_id(self, channel_url: str) -> str:
         """Extract channel ID from various YouTube channel URL formats."""
@@ -56,7 +133,7 @@ class YouTubeTranscriptDownloader:
 
     def _create_output_dirs(self, channel_name: str) -> Tuple[str, str]:
         """Create necessary output directories."""
-        clean_channel_name = re.sub(r'[<>:"/\\|?*]', '', channel_name)
+        clean_channel_name = channel_name.translate(_INVALID_CHAR_TABLE)
         channel_dir = os.path.join(self.output_dir, clean_channel_name)
         transcript_dir = os.path.join(channel_dir, "transcripts")
         
@@ -65,39 +142,81 @@ class YouTubeTranscriptDownloader:
         
         return channel_dir, transcript_dir
 
+    def _channel_cache_path(self, channel_url: str) -> str:
+        """Return the cache file path for a channel listing."""
+        key = hashlib.md5(channel_url.encode('utf-8')).hexdigest()
+        return os.path.join(self.output_dir, '.cache', f'channel_{key}.json')
+
+    def _load_cached_channel(self, channel_url: str) -> Optional[Tuple[str, List[dict]]]:
+        """Load a recent cached channel listing, if one exists."""
+        cache_path = self._channel_cache_path(channel_url)
+        try:
+            if time.time() - os.path.getmtime(cache_path) < self.CHANNEL_CACHE_TTL:
+                with open(cache_path, 'rb') as f:
+                    cached = orjson.loads(f.read())
+                logger.info(f"Using cached channel listing for: {channel_url}")
+                return cached['channel_name'], cached['videos']
+        except (OSError, ValueError, KeyError):
+            pass
+        return None
+
+    def _save_channel_cache(self, channel_url: str, channel_name: str,
+                            videos: List[dict]) -> None:
+        """Persist a channel listing so repeat runs skip the fetch."""
+        cache_path = self._channel_cache_path(channel_url)
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(cache_path, 'wb') as f:
+            f.write(orjson.dumps({'channel_name': channel_name, 'videos': videos}))
+
     def _get_channel_videos(self, channel_url: str) -> Tuple[str, List[dict]]:
         """Extract channel name and video information using yt-dlp."""
+        cached = self._load_cached_channel(channel_url)
+        if cached is not None:
+            return cached
+
         ydl_opts = {
             'ignoreerrors': True,
             'extract_flat': True,
             'quiet': True,
             'no_warnings': True,
             'playlistend': 50,  # Limit for testing, remove or adjust as needed
-            'extract_flat': True,
             'playlist_items': '1:50',  # Adjust range as needed
             'skip_download': True,
-            'format': 'best'
+            'format': 'best',
+            # Dates come from the tab listing itself rather than one
+            # extra request per video.
+            'extractor_args': {'youtubetab': {'approximate_date': ['true']}},
         }
-        
+
         try:
-            # First, get the channel's uploads playlist
             with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                logger.info(f"Fetching channel info from: {channel_url}")
-                channel_info = ydl.extract_info(channel_url, download=False)
-                
+                # Asking for the /videos tab directly returns the uploads
+                # playlist in a single round-trip.
+                videos_url = channel_url
+                if not videos_url.rstrip('/').endswith('/videos'):
+                    videos_url = videos_url.rstrip('/') + '/videos'
+
+                logger.info(f"Fetching channel info from: {videos_url}")
+                channel_info = ydl.extract_info(videos_url, download=False)
+
                 if not channel_info:
                     raise Exception("Could not fetch channel information")
-                
-                channel_name = channel_info.get('channel', 'Unknown_Channel')
-                channel_id = channel_info.get('channel_id')
-                
-                if not channel_id:
-                    raise Exception("Could not find channel ID")
-                
-                # Get the channel's uploads playlist
-                playlist_url = f'https://www.youtube.com/channel/{channel_id}/videos'
-                playlist_info = ydl.extract_info(playlist_url, download=False)
-                
+
+                channel_name = (channel_info.get('channel')
+                                or channel_info.get('uploader')
+                                or 'Unknown_Channel')
+
+                playlist_info = channel_info
+                if not playlist_info.get('entries'):
+                    # The tab listing came back empty; fall back to the
+                    # canonical uploads-playlist URL for the channel ID.
+                    channel_id = channel_info.get('channel_id')
+                    if not channel_id:
+                        raise Exception("Could not find channel ID")
+
+                    playlist_url = f'https://www.youtube.com/channel/{channel_id}/videos'
+                    playlist_info = ydl.extract_info(playlist_url, download=False)
+
                 if not playlist_info or 'entries' not in playlist_info:
                     raise Exception("Could not fetch channel videos")
                 
@@ -114,6 +233,7 @@ class YouTubeTranscriptDownloader:
                             })
                 
                 logger.info(f"Found {len(videos)} videos in channel: {channel_name}")
+                self._save_channel_cache(channel_url, channel_name, videos)
                 return channel_name, videos
                 
         except Exception as e:
@@ -124,122 +244,287 @@ class YouTubeTranscriptDownloader:
         """Attempt to get transcript using YouTube's API."""
         try:
             logger.info(f"Fetching transcript for video: {video_title} ({video_id})")
-            transcript = YouTubeTranscriptApi.get_transcript(video_id)
-            
-            # Format transcript with timestamps
-            formatted_transcript = []
-            for entry in transcript:
-                timestamp = int(entry['start'])
-                minutes = timestamp // 60
-                seconds = timestamp % 60
-                text = entry['text'].strip()
-                formatted_transcript.append(f"[{minutes:02d}:{seconds:02d}] {text}")
-            
-            return "\n".join(formatted_transcript)
-            
+            transcript = self._yt_api.fetch(video_id).to_raw_data()
+        except (YouTubeRequestFailed, RequestBlocked,
+                requests.exceptions.RetryError):
+            # Throttling/blocking is transient; let the async caller back
+            # off and retry instead of treating it as "no transcript".
+            # A sustained 429 surfaces as RetryError once the pooled
+            # adapter's own retry budget is spent, not as an HTTP status.
+            raise
         except Exception as e:
             logger.warning(f"Could not get transcript for {video_id}: {str(e)}")
             return None
 
-    def _use_whisper(self, video_url: str) -> Optional[str]:
-        """Use Whisper to generate transcript."""
-        try:
-            # Download audio using yt-dlp
-            ydl_opts = {
-                'format': 'bestaudio/best',
-                'postprocessors': [{
-                    'key': 'FFmpegExtractAudio',
-                    'preferredcodec': 'mp3',
-                    'preferredquality': '192',
-                }],
-                'quiet': True,
-                'no_warnings': True,
-                'outtmpl': 'temp_audio'
-            }
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                ydl.download([video_url])
-            
-            # TODO: Add your Whisper implementation here
-            # audio_path = 'temp_audio.mp3'
-            # transcript = your_whisper_function(audio_path)
-            
-            # Clean up
-            if os.path.exists('temp_audio.mp3'):
-                os.remove('temp_audio.mp3')
-            
-            return None  # Replace with actual transcript when Whisper is implemented
-            
-        except Exception as e:
-            logger.error(f"Whisper transcription failed: {str(e)}")
-            return None
+        # Format transcript with timestamps in one pass over the entries
+        buf = io.StringIO()
+        for entry in transcript:
+            minutes, seconds = divmod(int(entry['start']), 60)
+            buf.write(f"[{minutes:02d}:{seconds:02d}] {entry['text'].strip()}\n")
+
+        return buf.getvalue()
+
+    def _get_whisper_model(self) -> WhisperModel:
+        """Load the Whisper model on first use."""
+        with self._whisper_lock:
+            if self._whisper_model is None:
+                # CTranslate2 backend with quantized weights: int8 GEMM on
+                # CPU, float16 on CUDA hosts to hit the tensor cores.
+                if ctranslate2.get_cuda_device_count() > 0:
+                    device, compute_type = "cuda", "float16"
+                else:
+                    device, compute_type = "cpu", "int8"
+                logger.info(f"Loading Whisper model (base, {device}/{compute_type})")
+                self._whisper_model = WhisperModel("base", device=device,
+                                                  compute_type=compute_type)
+            return self._whisper_model
+
+    def _download_audio(self, video_url: str) -> str:
+        """Download a video's audio track and return the mp3 path."""
+        # Each download gets its own directory so concurrent fetches
+        # cannot clobber each other's output files.
+        temp_dir = tempfile.mkdtemp(prefix='yt_audio_')
+        _TEMP_AUDIO_DIRS.add(temp_dir)
+        audio_base = os.path.join(temp_dir, 'audio')
+        ydl_opts = {
+            'format': 'bestaudio/best',
+            'postprocessors': [{
+                'key': 'FFmpegExtractAudio',
+                'preferredcodec': 'mp3',
+                'preferredquality': '192',
+            }],
+            'quiet': True,
+            'no_warnings': True,
+            'outtmpl': audio_base
+        }
+
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            ydl.download([video_url])
+
+        return audio_base + '.mp3'
+
+    def _get_batched_pipeline(self) -> BatchedInferencePipeline:
+        """Wrap the Whisper model for batched chunk inference."""
+        if self._whisper_pipeline is None:
+            self._whisper_pipeline = BatchedInferencePipeline(
+                model=self._get_whisper_model())
+        return self._whisper_pipeline
+
+    def _transcribe_missing(self, videos: List[dict]) -> dict:
+        """Transcribe videos without captions, returning id -> transcript.
+
+        Audio downloads stay at most WHISPER_PREFETCH videos ahead of
+        inference, so the fetch for one video overlaps inference on
+        another without undrained mp3s accumulating on disk, and the
+        batched pipeline packs each file's 30-second chunks into single
+        encoder passes instead of one forward pass per chunk.
+        """
+        pipeline = self._get_batched_pipeline()
+
+        futures = {}
+        next_submit = 0
+
+        def submit_up_to(limit: int) -> None:
+            nonlocal next_submit
+            while next_submit < min(limit, len(videos)):
+                video = videos[next_submit]
+                futures[video['id']] = self._dl_pool.submit(
+                    self._download_audio,
+                    f"https://www.youtube.com/watch?v={video['id']}")
+                next_submit += 1
+
+        transcripts = {}
+        for index, video in enumerate(tqdm(videos, desc="Whisper fallback")):
+            submit_up_to(index + self.WHISPER_PREFETCH)
+            video_id = video['id']
+            audio_path = None
+            try:
+                audio_path = futures.pop(video_id).result()
+                segments, _info = pipeline.transcribe(
+                    audio_path, batch_size=self.WHISPER_BATCH_SIZE)
+                transcripts[video_id] = "".join(
+                    segment.text for segment in segments).strip()
+            except Exception as e:
+                logger.error(f"Whisper transcription failed for {video_id}: {str(e)}")
+            finally:
+                if audio_path:
+                    temp_dir = os.path.dirname(audio_path)
+                    shutil.rmtree(temp_dir, ignore_errors=True)
+                    _TEMP_AUDIO_DIRS.discard(temp_dir)
+
+        return transcripts
+
+    async def _get_transcript_async(self, video_id: str, video_title: str,
+                                    semaphore: asyncio.Semaphore) -> Optional[str]:
+        """Fetch a single transcript, backing off and retrying when throttled."""
+        async with semaphore:
+            for attempt in range(self.MAX_FETCH_ATTEMPTS):
+                try:
+                    return await asyncio.to_thread(self._get_transcript,
+                                                   video_id, video_title)
+                except (YouTubeRequestFailed, RequestBlocked,
+                        requests.exceptions.RetryError) as e:
+                    if attempt == self.MAX_FETCH_ATTEMPTS - 1:
+                        break
+                    # Exponential backoff with jitter so the concurrent
+                    # tasks don't all retry in lockstep.
+                    delay = 2 ** attempt + random.random()
+                    logger.warning(f"Request for {video_id} throttled "
+                                   f"({type(e).__name__}); retrying in {delay:.1f}s")
+                    await asyncio.sleep(delay)
+
+        # Recorded as a miss so a later run can pick the video up again.
+        logger.warning(f"Giving up on {video_id} after "
+                       f"{self.MAX_FETCH_ATTEMPTS} throttled attempts")
+        return None
+
+    def _save_transcript(self, transcript_dir: str, video: dict,
+                         transcript: str, transcript_source: str) -> dict:
+        """Write one transcript to disk and return its metadata entry."""
+        video_id = video['id']
+        video_title = video['title']
+
+        # Create a clean filename
+        clean_title = video_title.translate(_INVALID_CHAR_TABLE)
+        filename = f"{video['upload_date']}_{clean_title[:50]}_{video_id}.txt"
+        filepath = os.path.join(transcript_dir, filename)
+
+        # Header and body composed up front so the whole file goes out in
+        # a single write call
+        header = (f"Title: {video_title}\n"
+                  f"Video ID: {video_id}\n"
+                  f"Upload Date: {video['upload_date']}\n"
+                  f"Transcript Source: {transcript_source}\n"
+                  f"\n{'='*50}\n\n")
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(header + transcript)
+
+        return {
+            'video_id': video_id,
+            'title': video_title,
+            'upload_date': video['upload_date'],
+            'transcript_source': transcript_source,
+            'transcript_file': filename
+        }
+
+    async def _process_video_async(self, video: dict, semaphore: asyncio.Semaphore,
+                                   transcript_dir: str) -> Tuple[dict, Optional[dict]]:
+        """Fetch one video's transcript and persist it off the event loop."""
+        transcript = await self._get_transcript_async(video['id'], video['title'],
+                                                      semaphore)
+        if transcript is None:
+            return video, None
+
+        # Hand the disk write to the I/O pool so the loop is free to keep
+        # fetching while this transcript persists.
+        entry = await asyncio.get_running_loop().run_in_executor(
+            self._io_pool, self._save_transcript,
+            transcript_dir, video, transcript, "youtube_api")
+        return video, entry
+
+    @staticmethod
+    def _existing_transcript_ids(transcript_dir: str) -> set:
+        """Parse video IDs out of transcript filenames already on disk."""
+        # Filenames end in "_{video_id}.txt", so one directory scan tells
+        # us everything a warm run can skip. YouTube IDs are 11 chars of
+        # [A-Za-z0-9_-], so slice the stem rather than splitting on '_',
+        # which would truncate IDs that contain an underscore.
+        return {
+            name[:-4][-11:]
+            for name in os.listdir(transcript_dir)
+            if name.endswith('.txt')
+        }
+
+    def _load_metadata(self, channel_dir: str, channel_url: str,
+                       channel_name: str) -> dict:
+        """Load metadata.json from a previous run, or start a fresh one."""
+        metadata_path = os.path.join(channel_dir, 'metadata.json')
+        if os.path.exists(metadata_path):
+            try:
+                with open(metadata_path, 'rb') as f:
+                    metadata = orjson.loads(f.read())
+                metadata['download_date'] = datetime.now().isoformat()
+                return metadata
+            except (OSError, ValueError):
+                logger.warning("Could not read existing metadata.json; starting fresh")
+        return {
+            'channel_url': channel_url,
+            'channel_name': channel_name,
+            'download_date': datetime.now().isoformat(),
+            'videos': []
+        }
 
     def download_channel_transcripts(self, channel_url: str) -> None:
-        """Download transcripts for all videos in a channel."""
+        """Synchronous wrapper around download_channel_transcripts_async."""
+        asyncio.run(self.download_channel_transcripts_async(channel_url))
+
+    async def download_channel_transcripts_async(self, channel_url: str) -> None:
+        """Download transcripts for all videos in a channel concurrently."""
         try:
             # Get channel information
             channel_name, videos = self._get_channel_videos(channel_url)
             channel_dir, transcript_dir = self._create_output_dirs(channel_name)
-            
-            # Create metadata file
-            metadata = {
-                'channel_url': channel_url,
-                'channel_name': channel_name,
-                'download_date': datetime.now().isoformat(),
-                'videos': []
-            }
-            
-            logger.info(f"Processing {len(videos)} videos from {channel_name}")
-            
-            # Process each video
-            successful_downloads = 0
-            for video in tqdm(videos, desc="Downloading transcripts"):
-                video_id = video['id']
-                video_title = video['title']
-                video_url = f"https://www.youtube.com/watch?v={video_id}"
-                
-                # Try YouTube's built-in transcripts first
-                transcript = self._get_transcript(video_id, video_title)
-                transcript_source = "youtube_api"
-                
-                # Fall back to Whisper if needed and implemented
-                if transcript is None and self._use_whisper is not None:
-                    logger.info(f"Attempting Whisper for {video_title}")
-                    transcript = self._use_whisper(video_url)
-                    transcript_source = "whisper"
-                
-                if transcript:
-                    # Create a clean filename
-                    clean_title = re.sub(r'[<>:"/\\|?*]', '', video_title)
-                    filename = f"{video['upload_date']}_{clean_title[:50]}_{video_id}.txt"
-                    filepath = os.path.join(transcript_dir, filename)
-                    
-                    # Save transcript
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(f"Title: {video_title}\n")
-                        f.write(f"Video ID: {video_id}\n")
-                        f.write(f"Upload Date: {video['upload_date']}\n")
-                        f.write(f"Transcript Source: {transcript_source}\n")
-                        f.write("\n" + "="*50 + "\n\n")
-                        f.write(transcript)
-                    
-                    successful_downloads += 1
-                    
-                    # Update metadata
-                    metadata['videos'].append({
-                        'video_id': video_id,
-                        'title': video_title,
-                        'upload_date': video['upload_date'],
-                        'transcript_source': transcript_source,
-                        'transcript_file': filename
-                    })
-            
+
+            # Resume from any previous run: metadata.json is the source of
+            # truth, and transcripts already on disk are never refetched.
+            metadata = self._load_metadata(channel_dir, channel_url, channel_name)
+            existing_ids = self._existing_transcript_ids(transcript_dir)
+            metadata['videos'] = [
+                entry for entry in metadata['videos']
+                if entry['video_id'] in existing_ids
+            ]
+
+            to_fetch = [video for video in videos if video['id'] not in existing_ids]
+            if len(to_fetch) < len(videos):
+                logger.info(f"Skipping {len(videos) - len(to_fetch)} videos "
+                            "already transcribed on disk")
+
+            logger.info(f"Processing {len(to_fetch)} videos from {channel_name}")
+
+            # Fetch all transcripts concurrently; the semaphore keeps the
+            # number of simultaneous requests below YouTube's throttle point.
+            semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_FETCHES)
+            tasks = [
+                asyncio.create_task(
+                    self._process_video_async(video, semaphore, transcript_dir))
+                for video in to_fetch
+            ]
+
+            # The bar advances as tasks finish, in whatever order the
+            # network returns them.
+            results = []
+            for completed in atqdm.as_completed(tasks, total=len(tasks),
+                                                desc="Downloading transcripts"):
+                results.append(await completed)
+
+            # Metadata entries were buffered by the tasks; collect them and
+            # flush metadata.json once at the end.
+            entries = [entry for _video, entry in results if entry is not None]
+
+            # Whatever came back without captions goes through Whisper in
+            # one batched pass rather than per-video fallback calls.
+            missing = [video for video, entry in results if entry is None]
+            if missing:
+                logger.info(f"Attempting Whisper for {len(missing)} videos "
+                            "without captions")
+                whisper_transcripts = self._transcribe_missing(missing)
+                for video in missing:
+                    transcript = whisper_transcripts.get(video['id'])
+                    if transcript:
+                        entries.append(self._save_transcript(
+                            transcript_dir, video, transcript, "whisper"))
+
+            successful_downloads = len(entries)
+            metadata['videos'].extend(entries)
+
+
             # Save metadata
             metadata_path = os.path.join(channel_dir, 'metadata.json')
-            with open(metadata_path, 'w', encoding='utf-8') as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
+            with open(metadata_path, 'wb') as f:
+                # orjson emits UTF-8 bytes directly, so write in binary.
+                f.write(orjson.dumps(metadata, option=orjson.OPT_INDENT_2))
             
-            logger.info(f"\nDownload completed. Successfully downloaded {successful_downloads} out of {len(videos)} transcripts.")
+            logger.info(f"\nDownload completed. Successfully downloaded {successful_downloads} out of {len(to_fetch)} transcripts.")
             logger.info(f"Transcripts saved to: {transcript_dir}")
             logger.info(f"Metadata saved to: {metadata_path}")
             
@@ -1,8 +1,26 @@
+import fnmatch
+import functools
 import os
+import re
+import textwrap
 from pathlib import Path
-from typing import Set, TextIO
+from typing import FrozenSet, Iterator, Set, TextIO, Tuple
 from datetime import datetime
 
+@functools.lru_cache(maxsize=None)
+def _compile_patterns(patterns: FrozenSet[str]) -> 're.Pattern':
+    """Compile a set of glob patterns into a single alternation regex."""
+    return re.compile('|'.join(fnmatch.translate(p) for p in patterns))
+
+@functools.lru_cache(maxsize=None)
+def _should_ignore(name: str, patterns: FrozenSet[str]) -> bool:
+    """Check if a basename matches any of the ignore patterns.
+
+    Memoized because the same basenames (__init__.py, README.md, ...)
+    recur throughout a tree; repeats cost a dict lookup, not a match.
+    """
+    return _compile_patterns(patterns).fullmatch(name) is not None
+
 def write_project_to_file(
     startpath: str = '.',
     output_file: str = 'project_contents.txt',
@@ -12,7 +30,7 @@ def write_project_to_file(
 ) -> None:
     """
     Write the entire project structure and file contents to a text file.
-    
+
     Args:
         startpath: Root directory to start from
         output_file: Name of the output file
@@ -22,65 +40,61 @@ def write_project_to_file(
     """
     # Convert startpath to absolute path
     startpath = os.path.abspath(startpath)
-    
-    def should_ignore(path: str, patterns: Set[str]) -> bool:
-        """Check if path matches any of the ignore patterns."""
-        name = os.path.basename(path)
-        return any(
-            name == pattern or 
-            (pattern.startswith('*') and name.endswith(pattern[1:]))
-            for pattern in patterns
-        )
-    
+
+    # Hashable pattern sets so the compiled regexes and per-name match
+    # results are shared across calls via the lru_caches above.
+    ignore_dirs = frozenset(ignore_dirs)
+    ignore_files = frozenset(ignore_files)
+
+    def walk(path: str, depth: int) -> Iterator[Tuple[os.DirEntry, int]]:
+        """Yield (entry, depth) pairs, pruning ignored directories."""
+        with os.scandir(path) as entries:
+            for entry in sorted(entries, key=lambda e: (e.is_file(), e.name)):
+                if entry.is_dir(follow_symlinks=False):
+                    if not _should_ignore(entry.name, ignore_dirs):
+                        yield entry, depth
+                        yield from walk(entry.path, depth + 1)
+                elif entry.is_file():
+                    if not _should_ignore(entry.name, ignore_files):
+                        yield entry, depth
+
     def write_file_contents(file_path: str, f: TextIO, indent_level: int) -> None:
         """Write the contents of a file with proper indentation."""
         try:
             with open(file_path, 'r', encoding='utf-8') as source_file:
                 f.write(f"{indent * indent_level}File Contents:\n")
                 f.write(f"{indent * indent_level}" + "=" * 50 + "\n")
-                for line in source_file:
-                    f.write(f"{indent * indent_level}{line}")
+                # Indent the whole file in one C-level string operation
+                # rather than one write call per source line.
+                f.write(textwrap.indent(source_file.read(), indent * indent_level))
                 f.write(f"{indent * indent_level}" + "=" * 50 + "\n\n")
         except Exception as e:
             f.write(f"{indent * indent_level}[Error reading file: {str(e)}]\n\n")
-    
+
     with open(output_file, 'w', encoding='utf-8') as f:
         # Write header information
         f.write(f"Project Export - {os.path.basename(startpath)}\n")
         f.write(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
         f.write("=" * 50 + "\n\n")
-        
+
         # Write project structure and contents
-        for root, dirs, files in os.walk(startpath):
-            # Remove ignored directories
-            dirs[:] = [d for d in dirs if not should_ignore(d, ignore_dirs)]
-            
-            # Calculate level for indentation
-            level = root[len(startpath):].count(os.sep)
-            
-            # Write directory name
-            indent_str = indent * level
-            folder_name = os.path.basename(root)
-            if level == 0:
-                f.write('📁 .\n')
+        f.write('📁 .\n')
+        for entry, depth in walk(startpath, 1):
+            indent_str = indent * depth
+            if entry.is_dir(follow_symlinks=False):
+                f.write(f'{indent_str}📁 {entry.name}\n')
             else:
-                f.write(f'{indent_str}📁 {folder_name}\n')
-            
-            # Write files and their contents
-            for file in sorted(files):
-                if not should_ignore(file, ignore_files):
-                    file_path = os.path.join(root, file)
-                    f.write(f'{indent_str}{indent}📄 {file}\n')
-                    
-                    # Only write contents of text-based files
-                    if file.endswith(('.py', '.txt', '.md', '.json', '.yml', '.yaml', '.ini', '.cfg')):
-                        write_file_contents(file_path, f, level + 2)
+                f.write(f'{indent_str}📄 {entry.name}\n')
+
+                # Only write contents of text-based files
+                if entry.name.endswith(('.py', '.txt', '.md', '.json', '.yml', '.yaml', '.ini', '.cfg')):
+                    write_file_contents(entry.path, f, depth + 1)
 
 if __name__ == '__main__':
     # Get the project root directory (assuming this script is in the project)
     project_root = str(Path(__file__).parent.parent)
     dir_ = ""
-    
+
     write_project_to_file(
         startpath=dir_ or project_root,
         output_file='full-project.txt',
@@ -94,4 +108,4 @@ if __name__ == '__main__':
             '.gitignore', '.env', '*.pyc', '.DS_Store',
             '*.pyo', '*.pyd', '.Python', '*.so'
         }
-    )
\ No newline at end of file
+    )
@@ -1,20 +1,26 @@
 import os
+import shutil
+
+# Copy file-to-file in 1 MiB blocks so aggregation is bounded by
+# sequential read throughput rather than per-line syscall overhead.
+BUFFER_SIZE = 1 << 20
 
 def write_transcripts_to_file(directory, output_file):
-    with open(output_file, 'w', encoding='utf-8') as outfile:
-        for filename in os.listdir(directory):
-            if filename.endswith('.txt'):
-                file_path = os.path.join(directory, filename)
-                with open(file_path, 'r', encoding='utf-8') as infile:
-                    # Write the video title (filename without extension)
-                    video_title = os.path.splitext(filename)[0]
-                    outfile.write(f"Title: {video_title}\n")
-                    
-                    # Write the transcript content
-                    transcript = infile.read()
-                    outfile.write(transcript + "\n\n")
+    with open(output_file, 'wb', buffering=BUFFER_SIZE) as outfile:
+        with os.scandir(directory) as entries:
+            for entry in sorted(entries, key=lambda e: e.name):
+                if not entry.name.endswith('.txt') or not entry.is_file():
+                    continue
+                # Write the video title (filename without extension)
+                video_title = os.path.splitext(entry.name)[0]
+                outfile.write(f"Title: {video_title}\n".encode('utf-8'))
+
+                # Stream the transcript content without loading it whole
+                with open(entry.path, 'rb', buffering=BUFFER_SIZE) as infile:
+                    shutil.copyfileobj(infile, outfile, length=BUFFER_SIZE)
+                outfile.write(b"\n\n")
 
 # Usage
 directory_path = 'transcripts/Spencer Benterud/transcripts'
 output_file_path = 'Spencer-Benterud-transcripts.txt'
-write_transcripts_to_file(directory_path, output_file_path)
\ No newline at end of file
+write_transcripts_to_file(directory_path, output_file_path)